@@ -6,12 +6,10 @@ from typing import Any, Dict
 
 import click
 
-from .data_loader import DataLoader
-from .solvers.beam import UnifiedOptimizer
-from .solvers.greedy import GreedyOptimizer
-from .models import Inputs
-from .reporter import OptimizationReporter
-from .utils import setup_logger, build_default_profile, build_profiles_from_json
+from .models import Inputs, OrbTable
+
+# Loader, solvers and reporter are imported inside the commands that use them,
+# so `--help` and shell completion don't pay for importing the whole package.
 
 # ---------- Root group: loads everything once ----------
 @click.group()
@@ -95,6 +93,9 @@ def cli(
     verbose: bool,
 ):
     """🧮 The Demonized Orb Optimizer"""
+    from .data_loader import DataLoader
+    from .utils import setup_logger, build_default_profile, build_profiles_from_json
+
     logger = setup_logger(verbose)
     loader = DataLoader(logger)
 
@@ -117,6 +118,9 @@ def cli(
         )]
         shareable = None
 
+    # Set encoding of the inventory, built once for all solvers
+    orb_table = OrbTable.from_orbs(orb_data)
+
     # Stash normalized inputs for all subcommands
     ctx.obj = {
         "logger": logger,
@@ -126,6 +130,7 @@ def cli(
             categories=cat_data,
             profiles=profile_list,
             shareable_categories=shareable,
+            orb_table=orb_table,
         ),
     }
 
@@ -150,6 +155,9 @@ def cli(
 @click.pass_obj
 def cmd_optimize(shared: Dict[str, Any], topk: int, beam: int, refine_passes: int, refine_report: bool):
     """Optimize via beam search + optional refine."""
+    from .reporter import OptimizationReporter
+    from .solvers.beam import UnifiedOptimizer
+
     logger = shared["logger"]
     inputs: Inputs = shared["inputs"]
 
@@ -173,6 +181,9 @@ def cmd_optimize(shared: Dict[str, Any], topk: int, beam: int, refine_passes: in
 @click.pass_obj
 def test(shared: Dict[str, Any]):
     """placeholder for alternative optimization methods"""
+    from .reporter import OptimizationReporter
+    from .solvers.greedy import GreedyOptimizer
+
     logger = shared["logger"]
     inputs: Inputs = shared["inputs"]
     greedy = GreedyOptimizer(inputs=inputs, logger=logger)
@@ -17,8 +17,11 @@ Paths are provided by CLI. Optional files fall back to defaults.
 from __future__ import annotations
 
 import json
+import logging
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, TYPE_CHECKING
+from types import MappingProxyType
+from typing import Any, Callable, Literal, Mapping, TYPE_CHECKING
 
 from .models import Orb, Category
 from .utils import parse_value
@@ -30,9 +33,52 @@ from .defaults import (
     DEFAULT_SET_PRIORITY_WEIGHTS,
 )
 
+_json_loads: Callable[[bytes], Any]
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+except ImportError:  # pragma: no cover
+    _json_loads = json.loads  # Fallback: stdlib parser (also accepts bytes)
+
 if TYPE_CHECKING:
     from logging import Logger
 
+WeightKind = Literal["set_priority", "orb_type", "orb_level"]
+
+# kind -> (built-in defaults, label used in log messages)
+_KIND_TO_DEFAULT: dict[str, tuple[Mapping[str, float], str]] = {
+    "set_priority": (DEFAULT_SET_PRIORITY_WEIGHTS, "set priorities"),
+    "orb_type": (DEFAULT_ORB_TYPE_WEIGHTS, "orb-types"),
+    "orb_level": (DEFAULT_ORB_LEVEL_WEIGHTS, "orb-levels"),
+}
+
+
+@lru_cache(maxsize=32)
+def _parse_weights_file(
+    resolved_path: str, mtime_ns: int
+) -> tuple[Mapping[str, float] | None, tuple[tuple[Any, Any], ...]]:
+    """Parse a name -> weight JSON file into a read-only mapping.
+
+    Cached per (path, mtime) so every profile pointing at the same file shares
+    one parse; `mtime_ns` is only part of the key, to drop stale entries.
+
+    Returns:
+        (weights, invalid): `weights` is None if the file isn't a JSON object;
+        `invalid` lists (key, value) entries that couldn't be read as floats.
+    """
+    raw = _json_loads(Path(resolved_path).read_bytes())
+    if not isinstance(raw, dict):
+        return None, ()
+    out: dict[str, float] = {}
+    invalid: list[tuple[Any, Any]] = []
+    for k, v in raw.items():
+        try:
+            out[str(k)] = float(v)
+        except (TypeError, ValueError):
+            invalid.append((k, v))
+    return MappingProxyType(out), tuple(invalid)
+
 
 class DataLoader:
     """Handles loading and normalization of game data files (thresholds-only)."""
@@ -44,11 +90,10 @@ class DataLoader:
     def load_json(self, file_path: str | Path) -> Any:
         path = Path(file_path)
         if not path.exists():
-            self.logger.error(f"❌ File not found: {file_path}")
+            self.logger.error("❌ File not found: %s", file_path)
             raise FileNotFoundError(file_path)
-        with open(path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        self.logger.debug(f"📘 Loaded file: {file_path}")
+        data = _json_loads(path.read_bytes())
+        self.logger.debug("📘 Loaded file: %s", file_path)
         return data
 
     # -------- Core required data --------
@@ -56,34 +101,51 @@ class DataLoader:
         """Load orbs and clip their levels per rarity caps."""
         raw = self.load_json(file_path)
         out: list[Orb] = []
+        clipped = 0
+        is_debug = self.logger.isEnabledFor(logging.DEBUG)
+        # Bind per-row lookups once; the loop body then only touches fast locals
+        caps_get = DEFAULT_LEVEL_CAPS.get
+        parse = parse_value
+        debug = self.logger.debug
+        append = out.append
         for item in raw:
             raw_level = item.get("level", 0)
-            try:
-                lvl = int(raw_level) if raw_level is not None else 0
-            except Exception:
-                lvl = 0
+            if type(raw_level) is int:
+                lvl = raw_level
+            else:
+                try:
+                    lvl = int(raw_level) if raw_level is not None else 0
+                except Exception:
+                    lvl = 0
 
             rarity = item["rarity"]
-            max_lvl = DEFAULT_LEVEL_CAPS.get(rarity, 0)
+            max_lvl = caps_get(rarity, 0)
             if lvl > max_lvl:
-                self.logger.warning(
-                    f"⚠️ Orb level {lvl} exceeds cap {max_lvl} for rarity {rarity}; clipping."
-                )
+                # Per-row detail only in debug; one summary warning after the loop
+                clipped += 1
+                if is_debug:
+                    debug("⚠️ Orb level %d exceeds cap %d for rarity %s; clipping.", lvl, max_lvl, rarity)
                 lvl = max_lvl
 
             try:
-                out.append(
+                raw_value = item["value"]
+                append(
                     Orb(
                         type=item["type"],
                         set_name=item["set"],
                         rarity=rarity,
-                        value=parse_value(item["value"]),
+                        # JSON numbers are already floats; only strings need parsing
+                        value=raw_value if type(raw_value) is float else parse(raw_value),
                         level=lvl,
                     )
                 )
             except KeyError as e:
-                self.logger.warning(f"⚠️ Missing key {e} in orb entry: {item}")
-        self.logger.info(f"✅ Loaded {len(out)} orbs.")
+                self.logger.warning("⚠️ Missing key %s in orb entry: %s", e, item)
+        if clipped:
+            self.logger.warning(
+                "⚠️ Clipped %d orb level(s) to their rarity cap (use --verbose for details).", clipped
+            )
+        self.logger.info("✅ Loaded %d orbs.", len(out))
         return out
 
     def load_categories(self, file_path: str | Path) -> list[Category]:
@@ -91,15 +153,20 @@ class DataLoader:
         raw = self.load_json(file_path)
         if not isinstance(raw, dict):
             raise ValueError("slots.json must be an object mapping category -> slots (int).")
-        cats: list[Category] = []
-        for name, slots in raw.items():
-            try:
-                cats.append(Category(name=str(name), slots=int(slots)))
-            except (TypeError, ValueError):
-                self.logger.warning(
-                    f"⚠️ Invalid slots value for {name!r}: {slots!r} (skipped)"
-                )
-        self.logger.info(f"✅ Loaded {len(cats)} categories.")
+        try:
+            # Common case: every row is valid, so build the list in one pass
+            cats = [Category(name=str(name), slots=int(slots)) for name, slots in raw.items()]
+        except (TypeError, ValueError):
+            # Slow path only to report (and skip) the bad rows
+            cats = []
+            for name, slots in raw.items():
+                try:
+                    cats.append(Category(name=str(name), slots=int(slots)))
+                except (TypeError, ValueError):
+                    self.logger.warning(
+                        "⚠️ Invalid slots value for %r: %r (skipped)", name, slots
+                    )
+        self.logger.info("✅ Loaded %d categories.", len(cats))
         return cats
 
     # -------- Thresholds (required for scoring) --------
@@ -113,53 +180,46 @@ class DataLoader:
     def _load_weights_or_default(
         self,
         file_path: str | Path | None,
-        default_weights: dict[str, float],
+        default_weights: Mapping[str, float],
         name: str,
-    ) -> dict[str, float]:
-        """Generic loader for weight dictionaries with default fallback."""
+    ) -> Mapping[str, float]:
+        """Generic loader for weight dictionaries with default fallback.
+
+        Returns a read-only mapping (shared defaults or a frozen parsed file);
+        callers that need to mutate must take their own copy.
+        """
         if not file_path:
-            self.logger.info(f"ℹ️ No {name} file — using built-in defaults.")
-            return default_weights.copy()
+            self.logger.info("ℹ️ No %s file — using built-in defaults.", name)
+            return default_weights
 
         p = Path(file_path)
         if not p.exists():
             self.logger.warning(
-                f"⚠️ {name} file not found at {file_path} — using defaults."
+                "⚠️ %s file not found at %s — using defaults.", name, file_path
             )
-            return default_weights.copy()
-
-        raw = self.load_json(p)
-        if not isinstance(raw, dict):
-            self.logger.warning(f"⚠️ {name} file must be an object — using defaults.")
-            return default_weights.copy()
-
-        out: dict[str, float] = {}
-        for k, v in raw.items():
-            try:
-                out[str(k)] = float(v)
-            except (TypeError, ValueError):
-                self.logger.warning(f"⚠️ Invalid {name} for {k!r}: {v!r} (skipped)")
-
-        self.logger.info(f"✅ Loaded {len(out)} {name} from {file_path}.")
-        return out or default_weights.copy()
-
-    def load_set_priority_or_default(
-        self, file_path: str | Path | None
-    ) -> dict[str, float]:
-        return self._load_weights_or_default(
-            file_path, DEFAULT_SET_PRIORITY_WEIGHTS, "set priorities"
-        )
-
-    def load_orb_type_weights_or_default(
-        self, file_path: str | Path | None
-    ) -> dict[str, float]:
-        return self._load_weights_or_default(
-            file_path, DEFAULT_ORB_TYPE_WEIGHTS, "orb-types"
-        )
-
-    def load_orb_level_weights_or_default(
-        self, file_path: str | Path | None
-    ) -> dict[str, float]:
-        return self._load_weights_or_default(
-            file_path, DEFAULT_ORB_LEVEL_WEIGHTS, "orb-levels"
-        )
+            return default_weights
+
+        weights, invalid = _parse_weights_file(str(p.resolve()), p.stat().st_mtime_ns)
+        if weights is None:
+            self.logger.warning("⚠️ %s file must be an object — using defaults.", name)
+            return default_weights
+        for k, v in invalid:
+            self.logger.warning("⚠️ Invalid %s for %r: %r (skipped)", name, k, v)
+
+        self.logger.info("✅ Loaded %d %s from %s.", len(weights), name, file_path)
+        return weights or default_weights
+
+    def load_weights(
+        self, kind: WeightKind, file_path: str | Path | None
+    ) -> Mapping[str, float]:
+        """Load one of the optional weight files, falling back to its defaults.
+
+        Args:
+            kind: Which weights to load ("set_priority", "orb_type" or "orb_level").
+            file_path: Optional path to the JSON file.
+        """
+        try:
+            default_weights, name = _KIND_TO_DEFAULT[kind]
+        except KeyError:
+            raise ValueError(f"Unknown weights kind: {kind!r}") from None
+        return self._load_weights_or_default(file_path, default_weights, name)
@@ -1,6 +1,11 @@
 # ===== Built-in defaults (for optional knobs) =====
 
-DEFAULT_SET_PRIORITY_WEIGHTS: dict[str, float] = {
+from types import MappingProxyType
+from typing import Mapping
+
+# Weight tables are read-only views: loaders hand them out without copying.
+
+DEFAULT_SET_PRIORITY_WEIGHTS: Mapping[str, float] = MappingProxyType({
     "Leviathan": 8.0,
     "Beezlebub": 6.0,
     "Belphegor": 5.0,
@@ -8,10 +13,10 @@ DEFAULT_SET_PRIORITY_WEIGHTS: dict[str, float] = {
     "Mammon": 1.1,
     "Satan": 1.0,
     "Lucifer": 1.0,
-}
+})
 
 # Orb-type multipliers, no bias
-DEFAULT_ORB_TYPE_WEIGHTS: dict[str, float] = {
+DEFAULT_ORB_TYPE_WEIGHTS: Mapping[str, float] = MappingProxyType({
     "Flame": 1.0,
     "Water": 1.0,
     "Wind": 1.0,
@@ -20,7 +25,7 @@ DEFAULT_ORB_TYPE_WEIGHTS: dict[str, float] = {
     "Grass": 1.0,
     "Lightning": 1.0,
     "Steel": 1.0,
-}
+})
 
 # Level caps by rarity
 DEFAULT_LEVEL_CAPS: dict[str, int] = {
@@ -44,7 +49,7 @@ DEFAULT_SET_COUNTS: dict[str, list[int]] = {
 }
 
 # Additive points per unlocked tier (3/6/9) by orb type
-DEFAULT_ORB_LEVEL_WEIGHTS: dict[str, float] = {
+DEFAULT_ORB_LEVEL_WEIGHTS: Mapping[str, float] = MappingProxyType({
     "Flame": 1.0,
     "Water": 1.0,
     "Wind": 1.0,
@@ -53,4 +58,4 @@ DEFAULT_ORB_LEVEL_WEIGHTS: dict[str, float] = {
     "Grass": 1.0,
     "Lightning": 1.0,
     "Steel": 5.0,
-}
+})
@@ -3,11 +3,11 @@
 This module defines dataclasses that represent the main entities in the orb optimization system
 """
 
-from typing import Any, Dict, List, Optional
+from typing import Any, List, Mapping, Optional
 from dataclasses import dataclass
 
 
-@dataclass(slots=True)
+@dataclass(slots=True, frozen=True)
 class Orb:
     """Represents a single orb item.
 
@@ -25,12 +25,6 @@ class Orb:
     value: float
     level: int = 0
 
-    def __repr__(self) -> str:
-        return (
-            f"Orb(type='{self.type}', set='{self.set_name}', "
-            f"rarity='{self.rarity}', value={self.value}, level={self.level})"
-        )
-
 
 @dataclass(slots=True)
 class SetBonus:
@@ -59,7 +53,7 @@ class SetBonus:
         return max(applicable, default=0.0)
 
 
-@dataclass(slots=True)
+@dataclass(slots=True, frozen=True)
 class Category:
     """Represents an orb category, such as Soul or Wings.
 
@@ -71,9 +65,6 @@ class Category:
     name: str
     slots: int
 
-    def __repr__(self) -> str:
-        return f"Category(name='{self.name}', slots={self.slots})"
-
 
 # ========= Orb level tiers (per TYPE) =========
 
@@ -122,14 +113,56 @@ class OrbLevelSpec:
         return base * mul_prod + add_sum
 
 
+# ========= Inventory set encoding =========
+
+
+@dataclass(slots=True, frozen=True)
+class OrbTable:
+    """Integer set encoding of an orb inventory.
+
+    Set names are encoded against a sorted vocabulary, so solvers can keep
+    per-set counts and weights in lists indexed by set id rather than in
+    dicts keyed by name (see `align_sets`).
+
+    Attributes:
+        orbs: The inventory, in load order.
+        set_id: Index into `set_vocab` per orb.
+        set_vocab: Distinct set names, sorted.
+    """
+
+    orbs: tuple[Orb, ...]
+    set_id: tuple[int, ...]
+    set_vocab: tuple[str, ...]
+
+    @classmethod
+    def from_orbs(cls, orbs: List[Orb]) -> "OrbTable":
+        """Encode `orbs` in a single pass."""
+        rows = tuple(orbs)
+        sets = tuple(o.set_name for o in rows)
+        set_vocab = tuple(sorted(set(sets)))
+        set_index = {s: i for i, s in enumerate(set_vocab)}
+        return cls(
+            orbs=rows,
+            set_id=tuple(set_index[s] for s in sets),
+            set_vocab=set_vocab,
+        )
+
+    def __len__(self) -> int:
+        return len(self.orbs)
+
+    def align_sets(self, weights: Mapping[str, float], default: float) -> tuple[float, ...]:
+        """Return `weights` as a tuple indexed by `set_id`."""
+        return tuple(float(weights.get(s, default)) for s in self.set_vocab)
+
+
 @dataclass(slots=True, frozen=True)
 class ProfileConfig:
     """Configuration for a single profile (e.g., PVP or PVE)."""
 
     name: str
-    set_priority: Dict[str, float]
-    orb_type_weights: Dict[str, float]
-    orb_level_weights: Dict[str, float]
+    set_priority: Mapping[str, float]
+    orb_type_weights: Mapping[str, float]
+    orb_level_weights: Mapping[str, float]
     power: float = 2.0
     epsilon: float = 0.0
     objective: str = "sets-first"  # "sets-first" | "types-first"
@@ -140,4 +173,5 @@ class Inputs:
     orbs: Any                            # List[Orb]
     categories: Any                      # List[Category]
     profiles: List[ProfileConfig]        # normalized, ready to use
-    shareable_categories: Optional[List[str]]
\ No newline at end of file
+    shareable_categories: Optional[List[str]]
+    orb_table: Optional[OrbTable] = None  # set ids of `orbs`
\ No newline at end of file
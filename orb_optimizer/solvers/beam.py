@@ -3,48 +3,91 @@
 
 from __future__ import annotations
 
-import bisect
+import heapq
 import math
 import concurrent.futures
 from concurrent.futures import ProcessPoolExecutor
-from collections import Counter, defaultdict
-from dataclasses import asdict
-from itertools import combinations, product
-from typing import Any, Dict, List, Tuple, Optional
+from collections import defaultdict
+from dataclasses import dataclass
+from itertools import chain, combinations, product
+from operator import attrgetter, itemgetter
+from typing import Any, Callable, Dict, Iterable, List, Tuple, Optional
 
-from ..models import Orb, Category, ProfileConfig
+from ..models import Orb, OrbTable, Category, ProfileConfig
 from ..defaults import DEFAULT_SET_COUNTS
+from .common import orb_key, percentile_table, tiers_from_level
 
 
 # ----------------------------- helpers -----------------------------
 
-def _tiers_from_level(level: int) -> int:
-    """Return how many level tiers are unlocked at 3, 6, 9."""
-    return (1 if level >= 3 else 0) + (1 if level >= 6 else 0) + (1 if level >= 9 else 0)
+def _distinct_type_combos(orbs: List[Orb], k: int) -> List[tuple[Orb, ...]]:
+    """All k-orb combos with no repeated type, in `combinations(orbs, k)` order.
 
+    Built from per-type buckets (choose k types, then one orb of each), so the
+    same-type combos are never generated just to be filtered out.
+    """
+    by_type: Dict[str, List[int]] = defaultdict(list)
+    for i, o in enumerate(orbs):
+        by_type[o.type].append(i)
+    idx_combos = [
+        tuple(sorted(ix))
+        for groups in combinations(by_type.values(), k)
+        for ix in product(*groups)
+    ]
+    idx_combos.sort()
+    return [tuple(orbs[i] for i in ix) for ix in idx_combos]
+
+
+@dataclass(slots=True)
+class BeamNode:
+    """One partial beam state, stored as a delta on its parent.
+
+    Only the category placed at this step is kept (`choices`, one combo per
+    profile); the full assignment is rebuilt for the winner via `parent` links.
+    """
 
-def orb_key(o: Orb) -> tuple:
-    """Stable identity for an orb across processes."""
-    return (
-        getattr(o, "type", None),
-        getattr(o, "set_name", None),
-        getattr(o, "value", None),
-        getattr(o, "level", None),
-    )
+    parent: Optional[BeamNode]
+    cat_name: str
+    choices: tuple[tuple[Orb, ...], ...]
+    used_mask: int
+    scores: Dict[str, Tuple[List[int], float, float]]
+    key: Tuple[float, float]
 
 
-def _orb_ids(objs: List[Orb] | Tuple[Orb, ...]) -> set[tuple]:
-    """Set of stable orb keys for fast collision checks."""
-    return {orb_key(o) for o in objs}
+def _make_objective_fn(p: ProfileConfig) -> Callable[[float, float], Tuple[float, float]]:
+    """(set_s, orb_s) -> (primary, secondary) for `p`, with its objective and epsilon fixed."""
+    eps = p.epsilon
+    if p.objective == "types-first":
+        if eps:
+            return lambda set_s, orb_s: (orb_s + eps * set_s, set_s)
+        return lambda set_s, orb_s: (orb_s + 0.0, set_s)
+    if eps:
+        return lambda set_s, orb_s: (set_s + eps * orb_s, orb_s)
+    return lambda set_s, orb_s: (set_s + 0.0, orb_s)
 
 
-def _combo_key(combo: tuple[Orb, ...]) -> tuple:
-    """Hashable identity for a combo: sorted stable keys."""
-    return tuple(sorted(orb_key(o) for o in combo))
+def _primary_coefs(p: ProfileConfig) -> Tuple[float, float]:
+    """(set_s, orb_s) coefficients of `p`'s weighted primary key (see `_make_objective_fn`)."""
+    eps = p.epsilon or 0.0
+    if p.objective == "types-first":
+        return p.weight * eps, p.weight
+    return p.weight, p.weight * eps
 
 
 # --------- Batch scoring for multiprocessing (picklable ctx) ---------
 
+def _profile_ctx(p: ProfileConfig) -> Dict[str, Any]:
+    """Plain-dict copy of a profile for worker processes (weight views aren't picklable)."""
+    return {
+        "name": p.name,
+        "set_priority": dict(p.set_priority),
+        "power": p.power,
+        "epsilon": p.epsilon,
+        "objective": p.objective,
+        "weight": p.weight,
+    }
+
+
 def _score_combo_batch(
     batch: List[tuple[Orb, ...]],
     mp_ctx: Dict[str, Any],
@@ -53,43 +96,19 @@ def _score_combo_batch(
 
     mp_ctx keys:
       - profile_dict: dict or None
-      - remaining_cats_names: List[str]
-      - orb_base_scores: Dict[orb_key, float]
-      - orb_level_scores: Dict[orb_key, float]
+      - orb_contrib: Dict[profile name, Dict[orb_key, float]]  (weighted orb quality)
       - profiles_dicts: List[dict]  (for shared averaging)
-      - valid_combos_by_cat: Dict[str, List[tuple[Orb,...]]]
     """
     profile_dict = mp_ctx["profile_dict"]
-    remaining_names = mp_ctx["remaining_cats_names"]
-    base_scores = mp_ctx["orb_base_scores"]
-    level_scores = mp_ctx["orb_level_scores"]
+    orb_contrib = mp_ctx["orb_contrib"]
     profiles_dicts = mp_ctx["profiles_dicts"]
-    valid_combos_by_cat = mp_ctx["valid_combos_by_cat"]
 
     def approx_combo_score(prof: Dict[str, Any], combo: tuple[Orb, ...]) -> float:
         # Orb quality
+        contrib = orb_contrib[prof["name"]]
         orb_q = 0.0
         for o in combo:
-            k = orb_key(o)
-            orb_q += base_scores[k] * prof["orb_type_weights"].get(o.type, 1.0)
-            orb_q += level_scores[k] * prof["orb_level_weights"].get(o.type, 0.0)
-
-        # Lookahead: flexibility
-        if not remaining_names:
-            flex = 0.0
-        else:
-            used = {orb_key(o) for o in combo}
-            flex_sum = 0.0
-            for future_cat in remaining_names:
-                total = len(valid_combos_by_cat[future_cat])
-                if total == 0:
-                    continue
-                free = sum(
-                    1 for c in valid_combos_by_cat[future_cat]
-                    if not (used & {orb_key(o) for o in c})
-                )
-                flex_sum += (free / total)
-            flex = flex_sum / len(remaining_names)
+            orb_q += contrib[orb_key(o)]
 
         # Soft set hint
         set_hint = 0.0
@@ -149,13 +168,10 @@ class UnifiedOptimizer:
         self._orb_level_scores: Dict[tuple, float] = {}
         self._type_values: Dict[str, List[float]] = {}
 
-        # Precompute distributions for percentile scoring
+        # Precompute distributions for percentile scoring (values are floats from the loader)
         buckets: Dict[str, List[float]] = defaultdict(list)
         for o in self.P.orbs:
-            try:
-                buckets[o.type].append(float(o.value))
-            except Exception:
-                buckets[o.type].append(0.0)
+            buckets[o.type].append(o.value)
         for t, vals in buckets.items():
             vals.sort()
             self._type_values[t] = vals
@@ -163,16 +179,102 @@ class UnifiedOptimizer:
         # Precompute scores
         self._precompute_orb_scores()
 
-        # Precompute valid combos per category (no duplicate types)
+        # Objective per profile, resolved once instead of branching on every state
+        self._objective_fn = {p.name: _make_objective_fn(p) for p in self.P.profiles}
+
+        # Per-profile orb contribution (base*type_w + tiers*level_w), so beam states
+        # can extend their orb score by the new combo alone
+        self._orb_contrib: Dict[str, Dict[tuple, float]] = {}
+        for p in self.P.profiles:
+            tw, lw = p.orb_type_weights, p.orb_level_weights
+            self._orb_contrib[p.name] = {
+                k: self._orb_base_scores[k] * tw.get(k[0], 1.0)
+                + self._orb_level_scores[k] * lw.get(k[0], 0.0)
+                for k in self._orb_base_scores
+            }
+
+        # Precompute valid combos per category (no duplicate types); categories
+        # with the same slot count share one list
         self._valid_combos_by_cat: Dict[str, List[Tuple[Orb, ...]]] = {}
+        combos_by_slots: Dict[int, List[Tuple[Orb, ...]]] = {}
         for cat in self.P.categories:
-            combos = [c for c in combinations(self.P.orbs, cat.slots)
-                      if len({o.type for o in c}) == len(c)]
-            self._valid_combos_by_cat[cat.name] = combos
+            if cat.slots not in combos_by_slots:
+                combos_by_slots[cat.slots] = _distinct_type_combos(self.P.orbs, cat.slots)
+            self._valid_combos_by_cat[cat.name] = combos_by_slots[cat.slots]
+
+        # Integer set ids (from the shared OrbTable when the CLI built one): running set
+        # counts become list slots, and thresholds/priorities dense per-id lists
+        table = getattr(self.P, "orb_table", None) or OrbTable.from_orbs(self.P.orbs)
+        self._orb_set_id: Dict[tuple, int] = {
+            orb_key(o): sid for o, sid in zip(table.orbs, table.set_id)
+        }
+        self._set_thresholds: List[List[int]] = [
+            DEFAULT_SET_COUNTS.get(s) or [] for s in table.set_vocab
+        ]
+        self._set_priority: Dict[str, tuple[float, ...]] = {
+            p.name: table.align_sets(p.set_priority, 0.0) for p in self.P.profiles
+        }
+        # Set term by piece count, per profile and set id; counts past the top
+        # threshold reuse the last entry
+        self._set_terms: Dict[str, List[tuple[float, ...]]] = {
+            p.name: [
+                tuple(self._set_term(p, sid, c) for c in range(max(th, default=0) + 1))
+                for sid, th in enumerate(self._set_thresholds)
+            ]
+            for p in self.P.profiles
+        }
+
+        # Most one orb can add to a profile's weighted primary key: its exact orb
+        # contribution plus its set's largest one-piece step (smallest, if the set
+        # term counts negatively). Lets expansion skip candidates below the beam floor.
+        self._orb_primary_ub: Dict[str, Dict[tuple, float]] = {}
+        for p in self.P.profiles:
+            c_set, c_orb = _primary_coefs(p)
+            step_ub = []
+            for terms in self._set_terms[p.name]:
+                steps = [b - a for a, b in zip(terms, terms[1:])] + [0.0]
+                step_ub.append(c_set * (max(steps) if c_set >= 0 else min(steps)))
+            contrib = self._orb_contrib[p.name]
+            self._orb_primary_ub[p.name] = {
+                k: c_orb * contrib[k] + step_ub[self._orb_set_id[k]] for k in contrib
+            }
+
+        # One bit per distinct orb_key: inventory-usage checks become int AND/OR
+        self._orb_bit: Dict[tuple, int] = {}
+        for o in self.P.orbs:
+            self._orb_bit.setdefault(orb_key(o), 1 << len(self._orb_bit))
+
+        # Orb bitmask of every valid combo, parallel to `_valid_combos_by_cat` (and
+        # likewise shared between categories with the same slot count)
+        self._combo_masks_by_cat: Dict[str, List[int]] = {}
+        masks_by_list: Dict[int, List[int]] = {}
+        for name, combos in self._valid_combos_by_cat.items():
+            if id(combos) not in masks_by_list:
+                masks_by_list[id(combos)] = [self._combo_mask(c) for c in combos]
+            self._combo_masks_by_cat[name] = masks_by_list[id(combos)]
 
         # Reservations (for non-shareable categories)
         self.reserved_orbs = self._calculate_reserved_orbs()
 
+        # Per-category eligibility, resolved once instead of per combo per expansion:
+        # masks of orbs a category may use, and of orbs reserved for it (tried first).
+        # Reservations compare whole orbs (rarity included), which `orb_key` does not,
+        # so these masks use their own bits: one per distinct `Orb`. Keyed by value,
+        # not id(): scored combos come back from worker processes as copies.
+        self._elig_bit: Dict[Orb, int] = {}
+        for o in self.P.orbs:
+            self._elig_bit.setdefault(o, 1 << len(self._elig_bit))
+        self._usable_mask_by_cat: Dict[str, int] = {}
+        self._reserved_mask_by_cat: Dict[str, int] = {}
+        for cat in self.P.categories:
+            reserved = self.reserved_orbs.get(cat.name, {})
+            self._usable_mask_by_cat[cat.name] = self._elig_mask(
+                tuple(o for o in self.P.orbs if self._can_use_orb(o, cat))
+            )
+            self._reserved_mask_by_cat[cat.name] = self._elig_mask(
+                tuple(o for o in self.P.orbs if o in reserved.get(o.type, []))
+            )
+
         # Logs
         self.logger.info("📊 Category Analysis:")
         for cat in self.P.categories:
@@ -199,57 +301,93 @@ class UnifiedOptimizer:
     def _precompute_orb_scores(self):
         """Precompute and cache base scores for all orbs."""
         self.logger.info("🔄 Precomputing orb scores...")
+        pct = percentile_table(self._type_values)
         for orb in self.P.orbs:
-            try:
-                raw = float(orb.value)
-            except Exception:
-                raw = 0.0
             k = orb_key(orb)
-            self._orb_base_scores[k] = self._percentile_within_type(orb.type, raw)
-            self._orb_level_scores[k] = _tiers_from_level(orb.level)
+            self._orb_base_scores[k] = pct[orb.type][orb.value]
+            self._orb_level_scores[k] = tiers_from_level(orb.level)
         self.logger.info("✓ Finished precomputing scores for %d orbs", len(self.P.orbs))
 
-    def _percentile_within_type(self, t: str, v: float) -> float:
-        vals = self._type_values.get(t)
-        if not vals:
-            return 0.0
-        i = bisect.bisect_left(vals, v)
-        j = bisect.bisect_right(vals, v)
-        rank = (i + j) / 2.0
-        if len(vals) == 1:
-            return 1.0
-        return rank / (len(vals) - 1)
-
     def _score_one(self, prof: ProfileConfig, loadout: Dict[str, List[Orb]]) -> Tuple[float, float]:
         """Compute (set_score, orb_score) for a single profile."""
-        chosen = [o for group in loadout.values() for o in group]
-
-        # Set score
-        counts = Counter(o.set_name for o in chosen)
-        set_score = 0.0
-        for s, c in counts.items():
-            th = DEFAULT_SET_COUNTS.get(s)
-            if not th:
-                continue
-            tiers_met = sum(1 for t in th if c >= t)
-            if tiers_met <= 0:
-                continue
-            w = prof.set_priority.get(s, 0.0)
-            set_score += w * (tiers_met ** prof.power)
-
-        # Orb score (cached)
+        # One pass over the chosen orbs: piece count per set id + orb score
+        # (precomputed per-orb contribution for this profile)
+        contrib = self._orb_contrib[prof.name]
+        orb_set_id = self._orb_set_id
+        counts = [0] * len(self._set_thresholds)
+        seen: List[int] = []  # set ids in first-seen order, so sums add up as before
         orb_score = 0.0
-        for o in chosen:
+        for o in chain.from_iterable(loadout.values()):
             k = orb_key(o)
-            orb_score += self._orb_base_scores[k] * prof.orb_type_weights.get(o.type, 1.0)
-            orb_score += self._orb_level_scores[k] * prof.orb_level_weights.get(o.type, 0.0)
+            sid = orb_set_id[k]
+            if not counts[sid]:
+                seen.append(sid)
+            counts[sid] += 1
+            orb_score += contrib[k]
+
+        # Set score (tabulated per set id and piece count)
+        terms_by_set = self._set_terms[prof.name]
+        set_score = 0.0
+        for sid in seen:
+            terms = terms_by_set[sid]
+            set_score += terms[min(counts[sid], len(terms) - 1)]
 
         return set_score, orb_score
 
+    def _set_term(self, prof: ProfileConfig, sid: int, count: int) -> float:
+        """One set's contribution to `set_score` at `count` equipped pieces."""
+        th = self._set_thresholds[sid]
+        if not th:
+            return 0.0
+        tiers_met = sum(1 for t in th if count >= t)
+        if tiers_met <= 0:
+            return 0.0
+        return self._set_priority[prof.name][sid] * float(tiers_met ** prof.power)
+
+    def _set_term_at(self, pname: str, sid: int, count: int) -> float:
+        """Tabulated `_set_term` for profile `pname` (counts past the top threshold clamp)."""
+        terms = self._set_terms[pname][sid]
+        return terms[min(count, len(terms) - 1)]
+
+    def _extend_scores(
+        self,
+        scores: Dict[str, Tuple[List[int], float, float]],
+        choices_per_profile: tuple[tuple[Orb, ...], ...],
+    ) -> Tuple[Dict[str, Tuple[List[int], float, float]], Tuple[float, float]]:
+        """Incremental `_key`: add one category's combos to per-profile running scores.
+
+        `scores` maps profile name -> (piece count per set id, set_score, orb_score)
+        for the orbs assigned so far; only the orbs in the new combos are visited.
+        """
+        orb_set_id = self._orb_set_id
+        set_terms = self._set_terms
+        objective_fn = self._objective_fn
+        new_scores: Dict[str, Tuple[List[int], float, float]] = {}
+        primary = 0.0
+        secondary = 0.0
+        for p, cmb in zip(self.P.profiles, choices_per_profile):
+            counts, set_s, orb_s = scores[p.name]
+            contrib = self._orb_contrib[p.name]
+            terms_by_set = set_terms[p.name]
+            counts = list(counts)
+            for o in cmb:
+                k = orb_key(o)
+                orb_s += contrib[k]
+                sid = orb_set_id[k]
+                old = counts[sid]
+                counts[sid] = old + 1
+                terms = terms_by_set[sid]
+                top = len(terms) - 1
+                if old < top:
+                    set_s += terms[old + 1] - terms[old]
+            new_scores[p.name] = (counts, set_s, orb_s)
+            p1, p2 = objective_fn[p.name](set_s, orb_s)
+            primary += p.weight * p1
+            secondary += p.weight * p2
+        return new_scores, (primary, secondary)
+
     def _primary_secondary(self, prof: ProfileConfig, set_s: float, orb_s: float) -> Tuple[float, float]:
-        if prof.objective == "types-first":
-            return (orb_s + (prof.epsilon * set_s if prof.epsilon else 0.0), set_s)
-        return (set_s + (prof.epsilon * orb_s if prof.epsilon else 0.0), orb_s)
+        return self._objective_fn[prof.name](set_s, orb_s)
 
     def _key(self, assignments: Dict[str, Dict[str, List[Orb]]]) -> Tuple[float, float]:
         """Combined key across all profiles: (primary, secondary)."""
@@ -269,24 +407,33 @@ class UnifiedOptimizer:
         self.logger.info("⚙️ Starting optimization in BEAM mode...")
         return self._beam_search(beam_width)
 
-    def _copy_assign_with(
-        self,
-        assign: Dict[str, Dict[str, List[Orb]]],
-        cat_name: str,
-        choices_per_profile: List[tuple[Orb, ...]],
-    ) -> Dict[str, Dict[str, List[Orb]]]:
-        """Shallow copy `assign`, replacing only `cat_name` per profile with the given combos."""
-        new_assign: Dict[str, Dict[str, List[Orb]]] = {}
-        for p, cmb in zip(self.P.profiles, choices_per_profile):
-            pmap = assign[p.name]
-            new_pmap = dict(pmap)
-            new_pmap[cat_name] = list(cmb)
-            new_assign[p.name] = new_pmap
-        return new_assign
+    def _combo_mask(self, combo: tuple[Orb, ...]) -> int:
+        """Bitmask of the orbs in `combo` (see `_orb_bit`)."""
+        m = 0
+        for o in combo:
+            m |= self._orb_bit[orb_key(o)]
+        return m
+
+    def _elig_mask(self, combo: tuple[Orb, ...]) -> int:
+        """Bitmask of the orbs in `combo` for eligibility checks (see `_elig_bit`)."""
+        m = 0
+        for o in combo:
+            m |= self._elig_bit[o]
+        return m
+
+    def _materialize(self, node: BeamNode) -> Dict[str, Dict[str, List[Orb]]]:
+        """Rebuild the full per-profile assignment by walking `node`'s parent chain."""
+        assign: Dict[str, Dict[str, List[Orb]]] = {p.name: {c.name: [] for c in self.P.categories} for p in self.P.profiles}
+        while node.parent is not None:
+            for p, cmb in zip(self.P.profiles, node.choices):
+                assign[p.name][node.cat_name] = list(cmb)
+            node = node.parent
+        return assign
 
     def _beam_search(self, beam_width: int) -> Dict[str, Any]:
-        start_assign = {p.name: {c.name: [] for c in self.P.categories} for p in self.P.profiles}
-        partials = [{"assign": start_assign, "used_ids": set(), "key": (0.0, 0.0)}]
+        n_sets = len(self._set_thresholds)
+        start_scores = {p.name: ([0] * n_sets, 0.0, 0.0) for p in self.P.profiles}
+        partials = [BeamNode(None, "", (), 0, start_scores, (0.0, 0.0))]
 
         # Order categories (smallest spaces first)
         cats_info = []
@@ -309,18 +456,11 @@ class UnifiedOptimizer:
             adaptive_beam = self._get_adaptive_beam_width(cat_idx, len(cats), beam_width)
             adaptive_topk = self._get_adaptive_topk(cat.name)
 
-            # Remaining cats for lookahead
-            remaining_cats = cats[cat_idx + 1:]
-            remaining_names = [c.name for c in remaining_cats]
-
             # Build MP context
-            profiles_dicts = [asdict(p) for p in self.P.profiles]
+            profiles_dicts = [_profile_ctx(p) for p in self.P.profiles]
             mp_base_ctx = {
-                "remaining_cats_names": remaining_names,
-                "orb_base_scores": self._orb_base_scores,
-                "orb_level_scores": self._orb_level_scores,
+                "orb_contrib": self._orb_contrib,
                 "profiles_dicts": profiles_dicts,
-                "valid_combos_by_cat": self._valid_combos_by_cat,
             }
 
             # Score combos
@@ -329,15 +469,25 @@ class UnifiedOptimizer:
             batch_size = 1000
             num_procs = min(8, max(1, math.ceil(total_combos / max(1, batch_size))))
             batches = [combos[i:i + batch_size] for i in range(0, total_combos, batch_size)]
+            scored_by = "in-process" if len(batches) == 1 else f"using {num_procs} processes"
 
             scored_combos: List[List[tuple[Orb, ...]]] = []
 
+            # Only the best `min_required` combos per list are kept
+            min_required = max(adaptive_topk, int(total_combos * 0.1))
+
             def _score_all_batches(profile_dict: Optional[Dict[str, Any]]) -> List[tuple[float, tuple[Orb, ...]]]:
                 if total_combos == 0:
                     return []
                 ctx = dict(mp_base_ctx)
                 ctx["profile_dict"] = profile_dict
-                scored: List[tuple[float, tuple[Orb, ...]]] = []
+                if len(batches) == 1:
+                    # A single batch gains nothing from a worker process; skip the
+                    # spawn and the pickling of ctx/combos both ways
+                    scored = _score_combo_batch(batches[0], ctx)
+                    self.logger.info(f"   • Evaluated {total_combos}/{total_combos} combinations (100.0%)")
+                    return heapq.nlargest(min_required, scored, key=itemgetter(0))
+                scored = []
                 with ProcessPoolExecutor(max_workers=num_procs) as executor:
                     future_to_batch = {executor.submit(_score_combo_batch, batch, ctx): i for i, batch in enumerate(batches)}
                     completed = 0
@@ -349,28 +499,25 @@ class UnifiedOptimizer:
                             f"   • Evaluated {completed}/{total_combos} combinations "
                             f"({(completed/total_combos*100 if total_combos else 100):.1f}%)"
                         )
-                scored.sort(key=lambda x: x[0], reverse=True)
-                return scored
+                return heapq.nlargest(min_required, scored, key=itemgetter(0))
 
             if cat.name in self.shareable:
-                self.logger.info(f"⏳ Scoring combinations for shared category {cat.name} using {num_procs} processes")
+                self.logger.info(f"⏳ Scoring combinations for shared category {cat.name} {scored_by}")
                 scored = _score_all_batches(profile_dict=None)
-                min_required = max(adaptive_topk, int(total_combos * 0.1))
-                top = [c for _, c in scored[:min_required]]
+                top = [c for _, c in scored]
                 scored_combos.extend([top] * len(self.P.profiles))
             else:
                 for p_idx, p in enumerate(self.P.profiles):
                     self.logger.info(
                         f"⏳ Scoring combinations for profile {p.name} ({p_idx + 1}/{len(self.P.profiles)}) "
-                        f"using {num_procs} processes"
+                        f"{scored_by}"
                     )
-                    scored = _score_all_batches(profile_dict=asdict(p))
-                    min_required = max(adaptive_topk, int(total_combos * 0.1))
-                    top = [c for _, c in scored[:min_required]]
+                    scored = _score_all_batches(profile_dict=_profile_ctx(p))
+                    top = [c for _, c in scored]
                     scored_combos.append(top)
 
             # Expand beam with the chosen lists
-            next_states = self._expand_with_lists(partials, scored_combos, cat)
+            next_states, n_valid = self._expand_with_lists(partials, scored_combos, cat, adaptive_beam)
 
             # Fallback if Top-K produced nothing
             if not next_states:
@@ -381,7 +528,7 @@ class UnifiedOptimizer:
                     f"\n   • Beam width: {beam_width}"
                     f"\n   • Full combos per profile: {[len(l) for l in full_lists]}"
                 )
-                next_states = self._expand_with_lists(partials, full_lists, cat)
+                next_states, n_valid = self._expand_with_lists(partials, full_lists, cat, adaptive_beam)
                 if not next_states:
                     total_full = len(self._valid_combos_by_cat[cat.name])
                     self.logger.error(
@@ -394,156 +541,312 @@ class UnifiedOptimizer:
                         "Try increasing --beam or --topk, or removing this category from shareable_categories."
                     )
 
-            next_states.sort(key=lambda s: s["key"], reverse=True)
-            partials = next_states[:adaptive_beam]
+            partials = next_states
 
             self.logger.info(
                 f"🔍 Beam state for {cat.name}:"
-                f"\n   • Valid states found: {len(next_states)}"
+                f"\n   • Valid states found: {n_valid}"
                 f"\n   • After beam narrowing: {len(partials)}"
-                f"\n   • Top score: {partials[0]['key'][0] if partials else 'N/A'}"
+                f"\n   • Top score: {partials[0].key[0] if partials else 'N/A'}"
                 f"\n   • Score range: "
-                f"{(partials[-1]['key'][0] if partials else 'N/A')} - "
-                f"{(partials[0]['key'][0] if partials else 'N/A')}"
+                f"{(partials[-1].key[0] if partials else 'N/A')} - "
+                f"{(partials[0].key[0] if partials else 'N/A')}"
             )
 
         # Finish
-        best_state = max(partials, key=lambda s: s["key"])
+        best_state = max(partials, key=attrgetter("key"))
+        best_assign = self._materialize(best_state)
         profiles_out: Dict[str, Any] = {}
         for p in self.P.profiles:
-            set_s, orb_s = self._score_one(p, best_state["assign"][p.name])
-            profiles_out[p.name] = {"set_score": set_s, "orb_score": orb_s, "loadout": best_state["assign"][p.name]}
-        primary, _ = self._key(best_state["assign"])
-        return {"combined_score": primary, "profiles": profiles_out, "assign": best_state["assign"]}
+            set_s, orb_s = self._score_one(p, best_assign[p.name])
+            profiles_out[p.name] = {"set_score": set_s, "orb_score": orb_s, "loadout": best_assign[p.name]}
+        primary, _ = self._key(best_assign)
+        return {"combined_score": primary, "profiles": profiles_out, "assign": best_assign}
 
     # --------------------------- expansion helper ---------------------------
 
     def _expand_with_lists(
         self,
-        partials_in: List[Dict[str, Any]],
+        partials_in: List[BeamNode],
         per_prof_lists: List[List[tuple[Orb, ...]]],
         cat: Category,
-    ) -> List[Dict[str, Any]]:
-        out: List[Dict[str, Any]] = []
+        beam_width: int,
+    ) -> Tuple[List[BeamNode], int]:
+        """Expand every partial state with `cat`'s combos, keeping only the best `beam_width`.
+
+        Candidates stream into a bounded min-heap as they are generated, so rejected
+        states are never materialized. Returns (kept states best-first, number of
+        valid candidates seen); ties keep generation order, as a stable sort would.
+        """
+        # Entries are (key, -seq, node): the root is the weakest kept state, and for
+        # equal keys the later candidate is evicted first
+        heap: List[tuple[Tuple[float, float], int, BeamNode]] = []
+        seq = 0
+
+        def offer(state: BeamNode, choices: tuple[tuple[Orb, ...], ...], used_mask: int) -> None:
+            nonlocal seq
+            scores, key = self._extend_scores(state.scores, choices)
+            seq += 1
+            if len(heap) < beam_width:
+                heapq.heappush(heap, (key, -seq, BeamNode(state, cat.name, choices, used_mask, scores, key)))
+            elif key > heap[0][0]:
+                heapq.heapreplace(heap, (key, -seq, BeamNode(state, cat.name, choices, used_mask, scores, key)))
+
         shared_attempts = divergent_attempts = 0
         shared_valid = divergent_valid = 0
         max_attempts_per_state = 1000  # safety
 
-        # Filter/prioritize based on reservations
-        filtered_lists: List[List[tuple[Orb, ...]]] = []
+        # Filter/prioritize based on reservations. Every check runs on the combo's
+        # eligibility bitmask, computed once per distinct list (profiles often share one)
+        usable = self._usable_mask_by_cat[cat.name]
+        reserved = self._reserved_mask_by_cat[cat.name]
+        mask_of = self._combo_mask
+        elig_of = self._elig_mask
+        paired_by_list: Dict[int, List[tuple[tuple[Orb, ...], int]]] = {}
+        paired_lists: List[List[tuple[tuple[Orb, ...], int]]] = []
         for prof_list in per_prof_lists:
-            if cat.name not in self.shareable:
-                reserved_combos = [
-                    combo for combo in prof_list
-                    if all(self._can_use_orb(orb, cat) for orb in combo)
-                    and any(orb in self.reserved_orbs.get(cat.name, {}).get(orb.type, []) for orb in combo)
-                ]
-                other_combos = [
-                    combo for combo in prof_list
-                    if all(self._can_use_orb(orb, cat) for orb in combo) and combo not in reserved_combos
-                ]
-                filtered = reserved_combos + other_combos
-            else:
-                filtered = [combo for combo in prof_list if all(self._can_use_orb(orb, cat) for orb in combo)]
-            filtered_lists.append(filtered)
-        per_prof_lists = filtered_lists
+            paired = paired_by_list.get(id(prof_list))
+            if paired is None:
+                candidates: Iterable[tuple[tuple[Orb, ...], int]]
+                if prof_list is self._valid_combos_by_cat[cat.name]:
+                    # Full list (Top-K fallback): its masks were precomputed in __init__
+                    candidates = zip(prof_list, self._combo_masks_by_cat[cat.name])
+                else:
+                    # Top-K lists come back from the workers as copies; mask them here
+                    candidates = ((c, mask_of(c)) for c in prof_list)
+                eligible = [(c, m, e) for c, m in candidates if not (e := elig_of(c)) & ~usable]
+                if cat.name not in self.shareable:
+                    # Combos using an orb reserved for this category go first
+                    paired = [(c, m) for c, m, e in eligible if e & reserved]
+                    paired += [(c, m) for c, m, e in eligible if not e & reserved]
+                else:
+                    paired = [(c, m) for c, m, _ in eligible]
+                paired_by_list[id(prof_list)] = paired
+            paired_lists.append(paired)
+        profiles = self.P.profiles
+        shareable = cat.name in self.shareable
+        single_profile = len(profiles) == 1
+
+        # Candidates are checked against the beam floor before being scored in full.
+        # Each profile's scores depend only on its own combo, so a candidate's gain in
+        # the primary key is exact per profile: coef_orb * its orb contribution plus
+        # coef_set * the set-term change at the state's counts (its set pieces are
+        # kept as (set id, n) pairs for that).
+        coefs = [_primary_coefs(p) for p in profiles]
+        terms_by_depth = [self._set_terms[p.name] for p in profiles]
+
+        def set_pieces(c: tuple[Orb, ...]) -> tuple[tuple[int, int], ...]:
+            sids = [self._orb_set_id[orb_key(o)] for o in c]
+            return tuple((sid, sids.count(sid)) for sid in dict.fromkeys(sids))
+
+        def orb_gain(d: int, c: tuple[Orb, ...]) -> float:
+            contrib = self._orb_contrib[profiles[d].name]
+            return coefs[d][1] * sum(contrib[orb_key(o)] for o in c)
+
+        def gain(d: int, counts: List[int], og: float, pieces: tuple[tuple[int, int], ...]) -> float:
+            """Exact change in profile `d`'s weighted primary key from adding a combo."""
+            c_set = coefs[d][0]
+            if not c_set:
+                return og
+            terms_by_set = terms_by_depth[d]
+            set_gain = 0.0
+            for sid, n in pieces:
+                terms = terms_by_set[sid]
+                cnt = counts[sid]
+                top = len(terms) - 1
+                if cnt < top:
+                    set_gain += terms[min(cnt + n, top)] - terms[cnt]
+            return og + c_set * set_gain
+
+        def below_floor(primary: float) -> bool:
+            """True once the beam is full and a key with this primary can't enter it."""
+            if len(heap) < beam_width:
+                return False
+            floor = heap[0][0][0]
+            # Margin for rounding: gains add up deltas, real keys sum up totals
+            return primary < floor - 1e-9 * (1.0 + abs(floor))
+
+        # Per depth (profile): (combo, mask, orb gain, set pieces, static gain bound),
+        # and the best static bound still available from the depths below
+        bounded_lists: List[List[tuple[tuple[Orb, ...], int, float, tuple, float]]] = []
+        for d, (p, lst) in enumerate(zip(profiles, paired_lists)):
+            ub = self._orb_primary_ub[p.name]
+            bounded_lists.append([
+                (c, m, orb_gain(d, c), set_pieces(c), sum(ub[orb_key(o)] for o in c)) for c, m in lst
+            ])
+        tail_ub = [0.0] * (len(bounded_lists) + 1)
+        for d in range(len(bounded_lists) - 1, -1, -1):
+            tail_ub[d] = tail_ub[d + 1] + max((e[4] for e in bounded_lists[d]), default=0.0)
+        pruned = 0
+
+        shared_pool: List[tuple[tuple[Orb, ...], int, tuple, tuple[float, ...]]] = []
+        if shareable:
+            # A combo's mask identifies its orbs, so it doubles as the dedupe key
+            pool_map: Dict[int, tuple[Orb, ...]] = {}
+            for lst in paired_lists:
+                for c, m in lst:
+                    pool_map[m] = c
+            shared_pool = [
+                (c, m, set_pieces(c), tuple(orb_gain(d, c) for d in range(len(profiles))))
+                for m, c in pool_map.items()
+            ]
+
+        # Tuples of `product(*paired_lists)` under one choice at each depth, so a
+        # choice that is dropped is skipped together with everything below it
+        subtree = [math.prod(len(lst) for lst in paired_lists[d + 1:]) for d in range(len(paired_lists))]
+        last = len(paired_lists) - 1
+        budget = 0
+
+        def divergent(
+            state: BeamNode,
+            state_counts: List[List[int]],
+            d: int,
+            used: int,
+            masks: tuple[int, ...],
+            choices: tuple,
+            primary: float,
+        ) -> None:
+            """Depth-first `product(*paired_lists)` that drops hopeless prefixes early.
+
+            Valid tuples are offered in product order. A prefix is dropped when it
+            collides with used orbs, or when even the best completion can't beat
+            the beam floor (which only rises), so nothing dropped could have been
+            kept. Dropped tuples are still charged to `budget`, so the per-state cap
+            covers exactly the tuples a plain walk over the product would have tried.
+            """
+            nonlocal budget, divergent_attempts, divergent_valid, pruned
+            below = subtree[d]
+            counts = state_counts[d]
+            for c, m, og, pieces, _ in bounded_lists[d]:
+                if budget <= 0:
+                    return
+                if shareable and m in masks:
+                    # equal-or-disjoint: same combo as an earlier profile, same orbs
+                    new_used = used
+                elif used & m:
+                    skipped = min(below, budget)
+                    budget -= skipped
+                    divergent_attempts += skipped
+                    continue
+                else:
+                    new_used = used | m
+                new_primary = primary + gain(d, counts, og, pieces)
+                if below_floor(new_primary + tail_ub[d + 1]):
+                    skipped = min(below, budget)
+                    budget -= skipped
+                    divergent_attempts += skipped
+                    pruned += skipped
+                    continue
+                if d == last:
+                    budget -= 1
+                    divergent_attempts += 1
+                    offer(state, choices + (c,), new_used)
+                    divergent_valid += 1
+                else:
+                    divergent(state, state_counts, d + 1, new_used, masks + (m,), choices + (c,), new_primary)
 
         for state in partials_in:
-            used_ids = state["used_ids"]
+            used_mask = state.used_mask
+            state_counts = [state.scores[p.name][0] for p in profiles]
+            state_primary = state.key[0]
 
             # 1) Shared-first
-            if cat.name in self.shareable:
-                pool_map: Dict[tuple, tuple[Orb, ...]] = {}
-                for lst in per_prof_lists:
-                    for c in lst:
-                        pool_map[_combo_key(c)] = c
-                for c in pool_map.values():
-                    shared_attempts += 1
-                    ids = _orb_ids(c)
-                    if used_ids & ids:
-                        continue
-                    new_assign = self._copy_assign_with(state["assign"], cat.name, [c] * len(self.P.profiles))
-                    new_used = used_ids | ids
-                    key = self._key(new_assign)
-                    out.append({"assign": new_assign, "used_ids": new_used, "key": key})
-                    shared_valid += 1
-
-            # 2) Divergent (Cartesian)
-            attempts_this_state = 0
-            for choices in product(*per_prof_lists):
-                attempts_this_state += 1
-                if attempts_this_state > max_attempts_per_state:
-                    break
-
-                divergent_attempts += 1
-                id_sets = [_orb_ids(cmb) for cmb in choices]
-
-                if cat.name in self.shareable:
-                    # equal-or-disjoint + no overlap with used_ids
-                    if any(used_ids & s for s in id_sets):
-                        continue
-                    valid = True
-                    for i in range(len(id_sets)):
-                        for j in range(i + 1, len(id_sets)):
-                            if id_sets[i] != id_sets[j] and (id_sets[i] & id_sets[j]):
-                                valid = False
-                                break
-                        if not valid:
-                            break
-                    if not valid:
-                        continue
-                    new_used = set(used_ids)
-                    for s in id_sets:
-                        new_used |= s
-                else:
-                    # Non-shareable: pairwise disjoint and disjoint from used_ids
-                    new_used = set(used_ids)
-                    valid = True
-                    for s in id_sets:
-                        if new_used & s:
-                            valid = False
-                            break
-                        new_used |= s
-                    if not valid:
+            for c, m, pieces, ogs in shared_pool:
+                shared_attempts += 1
+                if used_mask & m:
+                    continue
+                primary = state_primary
+                for d, og in enumerate(ogs):
+                    primary += gain(d, state_counts[d], og, pieces)
+                if below_floor(primary):
+                    pruned += 1
+                    continue
+                offer(state, (c,) * len(profiles), used_mask | m)
+                shared_valid += 1
+
+            # Single profile: the "product" is just the one list. For a shareable
+            # category this re-offers the shared pass's combos, as the product walk
+            # always has; the duplicates compete for beam slots like any candidate.
+            if single_profile:
+                for c, m, og, pieces, _ in bounded_lists[0][:max_attempts_per_state]:
+                    divergent_attempts += 1
+                    if used_mask & m:
                         continue
-                    for i in range(len(id_sets)):
-                        for j in range(i + 1, len(id_sets)):
-                            if id_sets[i] & id_sets[j]:
-                                valid = False
-                                break
-                        if not valid:
-                            break
-                    if not valid:
+                    if below_floor(state_primary + gain(0, state_counts[0], og, pieces)):
+                        pruned += 1
                         continue
+                    offer(state, (c,), used_mask | m)
+                    divergent_valid += 1
+                continue
 
-                new_assign = self._copy_assign_with(state["assign"], cat.name, list(choices))
-                key = self._key(new_assign)
-                out.append({"assign": new_assign, "used_ids": new_used, "key": key})
-                divergent_valid += 1
+            # 2) Divergent (Cartesian), pruned at the first colliding or hopeless choice
+            budget = max_attempts_per_state
+            divergent(state, state_counts, 0, used_mask, (), (), state_primary)
 
         # Logs
         if cat.name in self.shareable:
             self.logger.info(
                 f"🔗 {cat.name} (Shareable) - Shared attempts: {shared_attempts}, Valid: {shared_valid} "
                 f"({shared_valid/max(1,shared_attempts)*100:.1f}%) | Divergent attempts: {divergent_attempts}, "
-                f"Valid: {divergent_valid} ({divergent_valid/max(1,divergent_attempts)*100:.1f}%)"
+                f"Valid: {divergent_valid} ({divergent_valid/max(1,divergent_attempts)*100:.1f}%), "
+                f"Pruned by bound: {pruned}"
             )
         else:
             self.logger.info(
                 f"📦 {cat.name} (Non-shareable) - Attempts: {divergent_attempts}, Valid: {divergent_valid} "
-                f"({divergent_valid/max(1,divergent_attempts)*100:.1f}%)"
+                f"({divergent_valid/max(1,divergent_attempts)*100:.1f}%), Pruned by bound: {pruned}"
             )
-        return out
+        heap.sort(reverse=True)
+        return [node for _, _, node in heap], shared_valid + divergent_valid
 
     # --------------------------- refinement ---------------------------
 
     def refine(self, assign: Dict[str, Dict[str, List[Orb]]], max_passes: int = 1) -> Dict[str, Dict[str, List[Orb]]]:
-        """Joint greedy refine for N profiles: try single-orb swaps profile-by-profile."""
+        """Joint greedy refine for N profiles: try single-orb swaps profile-by-profile.
+
+        Swaps are scored from deltas: each profile keeps running set counts and
+        (set_score, orb_score), and a trial only touches the two orbs it
+        exchanges. Validity is likewise checked only for the changed slot,
+        assuming the incoming assignment already satisfies the constraints
+        (beam results always do).
+        """
         if max_passes <= 0:
             return assign
 
         best = {p: {k: list(v) for k, v in assign[p].items()} for p in assign}
-        best_key = self._key(best)
+        profiles = [p for p in self.P.profiles if p.name in best]
+
+        # Per-profile running state: set counts by id, set/orb scores, used-orb mask
+        counts: Dict[str, List[int]] = {}
+        set_scores: Dict[str, float] = {}
+        orb_scores: Dict[str, float] = {}
+        used_masks: Dict[str, int] = {}
+        for p in profiles:
+            chosen = [orb_key(o) for group in best[p.name].values() for o in group]
+            cnt = [0] * len(self._set_thresholds)
+            for k in chosen:
+                cnt[self._orb_set_id[k]] += 1
+            counts[p.name] = cnt
+            set_scores[p.name] = sum(
+                self._set_term_at(p.name, sid, c) for sid, c in enumerate(cnt) if c
+            )
+            orb_scores[p.name] = sum(self._orb_contrib[p.name][k] for k in chosen)
+            used_masks[p.name] = self._combo_mask(tuple(o for group in best[p.name].values() for o in group))
+
+        def combined(override: Optional[str] = None, set_s: float = 0.0, orb_s: float = 0.0) -> Tuple[float, float]:
+            primary = 0.0
+            secondary = 0.0
+            for p in profiles:
+                fn = self._objective_fn[p.name]
+                if p.name == override:
+                    p1, p2 = fn(set_s, orb_s)
+                else:
+                    p1, p2 = fn(set_scores[p.name], orb_scores[p.name])
+                primary += p.weight * p1
+                secondary += p.weight * p2
+            return (primary, secondary)
+
+        best_key = combined()
 
         passes = 0
         improved = True
@@ -551,80 +854,71 @@ class UnifiedOptimizer:
             improved = False
             passes += 1
 
-            for pname, p_assign in list(best.items()):
+            for p in profiles:
+                pname = p.name
+                p_assign = best[pname]
+                contrib = self._orb_contrib[pname]
+                cnt = counts[pname]
                 for cat in self.P.categories:
-                    group = list(p_assign[cat.name])
+                    group = p_assign[cat.name]
                     types_in_cat = {o.type for o in group}
-                    current_ids_group = _orb_ids(tuple(group))
+                    group_mask = self._combo_mask(tuple(group))
+                    shareable = cat.name in self.shareable
+                    # Other profiles' masks for this category: shareable needs each distinct
+                    # one (equal-or-disjoint), non-shareable only their union (disjoint)
+                    others = {
+                        self._combo_mask(tuple(best[q.name][cat.name])) for q in profiles if q.name != pname
+                    }
+                    others_union = 0
+                    for B in others:
+                        others_union |= B
 
                     for i, old in enumerate(group):
+                        old_k = orb_key(old)
+                        old_sid = self._orb_set_id[old_k]
+                        rest_mask = group_mask & ~self._orb_bit[old_k]
                         for new in self.P.orbs:
-                            if orb_key(new) in current_ids_group:
+                            new_k = orb_key(new)
+                            new_bit = self._orb_bit[new_k]
+                            if new_bit & group_mask:
                                 continue
                             if new.type != old.type and new.type in types_in_cat:
                                 continue
+                            # Same orb already used by this profile in another category
+                            if new_bit & used_masks[pname]:
+                                continue
 
-                            trial = {pp: {k: list(v) for k, v in best[pp].items()} for pp in best}
-                            tgroup = list(trial[pname][cat.name])
-                            tgroup[i] = new
-                            trial[pname][cat.name] = tgroup
-
-                            # Category-level sharing/disjoint
-                            ids_per_profile = {pp: _orb_ids(tuple(trial[pp][cat.name])) for pp in trial}
-                            if cat.name in self.shareable:
-                                ok = True
-                                names = list(trial.keys())
-                                for a in range(len(names)):
-                                    for b in range(a + 1, len(names)):
-                                        A = ids_per_profile[names[a]]
-                                        B = ids_per_profile[names[b]]
-                                        if A != B and (A & B):
-                                            ok = False
-                                            break
-                                    if not ok:
-                                        break
-                                if not ok:
+                            # Category-level sharing/disjoint against the other profiles
+                            trial_mask = rest_mask | new_bit
+                            if shareable:
+                                if any(B != trial_mask and (B & trial_mask) for B in others):
                                     continue
-                            else:
-                                ok = True
-                                names = list(trial.keys())
-                                for a in range(len(names)):
-                                    for b in range(a + 1, len(names)):
-                                        if ids_per_profile[names[a]] & ids_per_profile[names[b]]:
-                                            ok = False
-                                            break
-                                    if not ok:
-                                        break
-                                if not ok:
-                                    continue
-
-                            # Global inventory uniqueness constraints
-                            ok = True
-                            per_profile_used: dict[str, set[tuple]] = {pp: set() for pp in trial.keys()}
-                            cross_profile_used_by_cat: dict[str, set[tuple]] = {c2.name: set() for c2 in self.P.categories}
-
-                            for pp, cats_map in trial.items():
-                                used_local = per_profile_used[pp]
-                                for c2 in self.P.categories:
-                                    ids = _orb_ids(tuple(cats_map[c2.name]))
-                                    if used_local & ids:
-                                        ok = False
-                                        break
-                                    used_local |= ids
-                                    if c2.name in self.shareable:
-                                        continue
-                                    if cross_profile_used_by_cat[c2.name] & ids:
-                                        ok = False
-                                        break
-                                    cross_profile_used_by_cat[c2.name] |= ids
-                                if not ok:
-                                    break
-                            if not ok:
+                            elif trial_mask & others_union:
                                 continue
 
-                            k = self._key(trial)
+                            # Score delta: two orbs, at most two sets
+                            orb_s = orb_scores[pname] - contrib[old_k] + contrib[new_k]
+                            set_s = set_scores[pname]
+                            new_sid = self._orb_set_id[new_k]
+                            if new_sid != old_sid:
+                                c_old = cnt[old_sid]
+                                c_new = cnt[new_sid]
+                                set_s += (
+                                    self._set_term_at(pname, old_sid, c_old - 1)
+                                    - self._set_term_at(pname, old_sid, c_old)
+                                    + self._set_term_at(pname, new_sid, c_new + 1)
+                                    - self._set_term_at(pname, new_sid, c_new)
+                                )
+
+                            k = combined(pname, set_s, orb_s)
                             if k > best_key:
-                                best = trial
+                                group[i] = new
+                                if new_sid != old_sid:
+                                    cnt[old_sid] -= 1
+                                    cnt[new_sid] += 1
+                                set_scores[pname] = set_s
+                                orb_scores[pname] = orb_s
+                                used_masks[pname] = (used_masks[pname] & ~self._orb_bit[old_k]) | new_bit
                                 best_key = k
                                 improved = True
                                 break
@@ -670,7 +964,7 @@ class UnifiedOptimizer:
             else 0.0
         )
 
-        sorted_by_type = {t: sorted(orbs, key=lambda o: float(o.value), reverse=True) for t, orbs in orbs_by_type.items()}
+        sorted_by_type = {t: sorted(orbs, key=lambda o: o.value, reverse=True) for t, orbs in orbs_by_type.items()}
 
         # First pass: minimal reservations per non-shareable category
         orbs_taken: Dict[str, set] = defaultdict(set)
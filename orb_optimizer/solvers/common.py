@@ -0,0 +1,45 @@
+"""Helpers shared by the beam and greedy solvers."""
+
+from __future__ import annotations
+
+from typing import Dict, List
+
+from ..models import Orb
+
+
+def tiers_from_level(level: int) -> int:
+    """Count level tiers unlocked at 3, 6, 9."""
+    return (level >= 3) + (level >= 6) + (level >= 9)
+
+
+def orb_key(o: Orb) -> tuple:
+    """Stable identity for an orb across processes."""
+    return (
+        getattr(o, "type", None),
+        getattr(o, "set_name", None),
+        getattr(o, "value", None),
+        getattr(o, "level", None),
+    )
+
+
+def percentile_table(type_values: Dict[str, List[float]]) -> Dict[str, Dict[float, float]]:
+    """Mid-rank percentile of every value of every type.
+
+    A value filling positions [i, j) of its type's sorted list ranks
+    (i + j) / 2 / (n - 1); a type with a single value ranks 1.0. One linear
+    pass per list. `type_values[t]` must be sorted ascending.
+    """
+    out: Dict[str, Dict[float, float]] = {}
+    for t, vals in type_values.items():
+        n = len(vals)
+        pct: Dict[float, float] = {}
+        i = 0
+        while i < n:
+            v = vals[i]
+            j = i + 1
+            while j < n and vals[j] == v:
+                j += 1
+            pct[v] = 1.0 if n == 1 else ((i + j) / 2.0) / (n - 1)
+            i = j
+        out[t] = pct
+    return out
@@ -17,13 +17,14 @@
 
 from __future__ import annotations
 
-import bisect
 from dataclasses import dataclass
-from collections import Counter, defaultdict
+from collections import defaultdict
+from itertools import chain
 from typing import Any, Dict, List, Tuple, Optional
 
-from ..models import Orb, Category, ProfileConfig
+from ..models import Orb, OrbTable, Category, ProfileConfig
 from ..defaults import DEFAULT_SET_COUNTS
+from .common import orb_key, percentile_table, tiers_from_level
 
 # Heuristic defaults
 ALPHA_DEFAULT = 0.2   # progress toward next threshold
@@ -33,39 +34,6 @@ DEBUG_TOP_N_DEFAULT = 5
 
 # ----------------------------- helpers -----------------------------
 
-def tiers_from_level(level: int) -> int:
-    """Count level tiers unlocked at 3, 6, 9."""
-    return (1 if level >= 3 else 0) + (1 if level >= 6 else 0) + (1 if level >= 9 else 0)
-
-
-def orb_key(o: Orb) -> tuple:
-    """Stable identity for an orb across processes."""
-    return (
-        getattr(o, "type", None),
-        getattr(o, "set_name", None),
-        getattr(o, "value", None),
-        getattr(o, "level", None),
-    )
-
-
-def _orb_ids(objs: List[Orb] | Tuple[Orb, ...]) -> set[tuple]:
-    """Set of stable orb keys for fast collision checks."""
-    return {orb_key(o) for o in objs}
-
-
-def percentile_within_type(type_values: Dict[str, List[float]], t: str, v: float) -> float:
-    """Percentile rank of value v within its type t using mid-rank."""
-    vals = type_values.get(t)
-    if not vals:
-        return 0.0
-    i = bisect.bisect_left(vals, v)
-    j = bisect.bisect_right(vals, v)
-    rank = (i + j) / 2.0
-    if len(vals) == 1:
-        return 1.0
-    return rank / (len(vals) - 1)
-
-
 @dataclass(slots=True)
 class ScoringCoefficients:
     set_primary: float
@@ -118,23 +86,55 @@ class GreedyOptimizer:
         self.profiles: List[ProfileConfig] = self.P.profiles
         self.shareable = set(getattr(self.P, "shareable_categories", None) or [])
 
-        # Precompute per-type distributions for percentile ranks
+        # Precompute per-type distributions for percentile ranks (values are floats from the loader)
         self._type_values: Dict[str, List[float]] = defaultdict(list)
         for o in self.orbs:
-            try:
-                self._type_values[o.type].append(float(o.value))
-            except Exception:
-                self._type_values[o.type].append(0.0)
+            self._type_values[o.type].append(o.value)
         for t in self._type_values:
             self._type_values[t].sort()
 
+        # Per-profile orb quality (percentile*type_w + tiers*level_w), resolved once
+        # instead of per candidate per slot
+        self._orb_contrib: Dict[str, Dict[tuple, float]] = {p.name: {} for p in self.profiles}
+        pct = percentile_table(self._type_values)
+        for o in self.orbs:
+            k = orb_key(o)
+            base = pct[o.type][o.value]
+            tiers = tiers_from_level(o.level)
+            for p in self.profiles:
+                self._orb_contrib[p.name][k] = (
+                    base * p.orb_type_weights.get(o.type, 1.0)
+                    + tiers * p.orb_level_weights.get(o.type, 0.0)
+                )
+
+        # Integer set ids (from the shared OrbTable when the CLI built one): running set
+        # counts become list slots, and set gains/terms are tabulated per piece count
+        table = getattr(self.P, "orb_table", None) or OrbTable.from_orbs(self.orbs)
+        self._orb_set_id: Dict[tuple, int] = {
+            orb_key(o): sid for o, sid in zip(table.orbs, table.set_id)
+        }
+        self._num_sets = len(table.set_vocab)
+        # Per profile and set id, indexed by pieces already placed (counts past the
+        # top threshold clamp): heuristic marginal gain, and the set's score term
+        self._set_gain: Dict[str, List[tuple[float, ...]]] = {}
+        self._set_terms: Dict[str, List[tuple[float, ...]]] = {}
+        for p in self.profiles:
+            gains: List[tuple[float, ...]] = []
+            terms: List[tuple[float, ...]] = []
+            for s in table.set_vocab:
+                top = max(DEFAULT_SET_COUNTS.get(s) or [0])
+                gains.append(tuple(self._set_gain_at(p, s, c) for c in range(top + 1)))
+                terms.append(tuple(self._set_term(p, s, c) for c in range(top + 1)))
+            self._set_gain[p.name] = gains
+            self._set_terms[p.name] = terms
+
         # Candidate pruning: keep top-K per type by (value + level tiers)
         self._candidates_by_type: Dict[str, List[Orb]] = defaultdict(list)
         by_type: Dict[str, List[Orb]] = defaultdict(list)
         for o in self.orbs:
             by_type[o.type].append(o)
         for t, typed in by_type.items():
-            typed.sort(key=lambda o: (float(getattr(o, "value", 0.0)) + tiers_from_level(o.level)), reverse=True)
+            typed.sort(key=lambda o: o.value + tiers_from_level(o.level), reverse=True)
             self._candidates_by_type[t] = typed[: self.topk]
 
         self.logger.info(
@@ -149,7 +149,7 @@ class GreedyOptimizer:
         """Run greedy construction and return beam-aligned result dict."""
         # assign[pname][cat] -> List[Orb]
         assign: Dict[str, Dict[str, List[Orb]]] = {p.name: {c.name: [] for c in self.categories} for p in self.profiles}
-        set_counts = {p.name: Counter() for p in self.profiles}
+        set_counts = {p.name: [0] * self._num_sets for p in self.profiles}
         used_ids_global: set[tuple] = set()
 
         # Process categories: shareable first (fewer constraints), then by descending slots
@@ -215,9 +215,10 @@ class GreedyOptimizer:
 
             if best_orb:
                 # Place the same orb in this category for ALL profiles (inventory is shared)
+                sid = self._orb_set_id[orb_key(best_orb)]
                 for p in self.profiles:
                     assign[p.name][cat.name].append(best_orb)
-                    set_counts[p.name][best_orb.set_name] += 1
+                    set_counts[p.name][sid] += 1
                 used_ids_global.add(orb_key(best_orb))
 
                 if self.enable_debug_breakdown and candidate_debug:
@@ -263,7 +264,7 @@ class GreedyOptimizer:
 
                 if best_orb:
                     assign[p.name][cat.name].append(best_orb)
-                    set_counts[p.name][best_orb.set_name] += 1
+                    set_counts[p.name][self._orb_set_id[orb_key(best_orb)]] += 1
                     used_ids_global.add(orb_key(best_orb))
                     types_in_cat.add(best_orb.type)
 
@@ -274,15 +275,28 @@ class GreedyOptimizer:
                     break
 
     # ---------------- Marginal Gain with Future Potential ----------------
-    def _marginal_gain(self, prof: ProfileConfig, orb: Orb, set_count: Counter) -> Tuple[float, float]:
-        """Return (d_set, d_orb) marginal contributions for placing `orb`."""
-        c_before = set_count[orb.set_name]
+    def _marginal_gain(self, prof: ProfileConfig, orb: Orb, set_counts: List[int]) -> Tuple[float, float]:
+        """Return (d_set, d_orb) marginal contributions for placing `orb`.
+
+        `set_counts` holds the profile's placed pieces per set id.
+        """
+        k = orb_key(orb)
+        gains = self._set_gain[prof.name][self._orb_set_id[k]]
+        d_set = gains[min(set_counts[self._orb_set_id[k]], len(gains) - 1)]
+
+        # Orb quality term (percentile within type + level tiers)
+        d_orb = self._orb_contrib[prof.name][k]
+
+        return d_set, d_orb
+
+    def _set_gain_at(self, prof: ProfileConfig, set_name: str, c_before: int) -> float:
+        """Heuristic set gain of adding one `set_name` piece with `c_before` already placed."""
         c_after = c_before + 1
-        th = DEFAULT_SET_COUNTS.get(orb.set_name, [])
+        th = DEFAULT_SET_COUNTS.get(set_name, [])
         tiers_before = sum(1 for t in th if c_before >= t)
         tiers_after  = sum(1 for t in th if c_after  >= t)
         d_tiers = max(0, tiers_after - tiers_before)
-        weight = prof.set_priority.get(orb.set_name, 0.0)
+        weight = prof.set_priority.get(set_name, 0.0)
 
         # Base marginal set gain (threshold crossing)
         d_set = d_tiers * weight
@@ -300,45 +314,42 @@ class GreedyOptimizer:
             if remaining > 0:
                 d_set += self.beta * weight * (remaining / max_tiers)
 
-        # Orb quality term (percentile within type + level tiers)
-        try:
-            raw = float(orb.value)
-        except Exception:
-            raw = 0.0
-        base = percentile_within_type(self._type_values, orb.type, raw)
-        d_orb = base * prof.orb_type_weights.get(orb.type, 1.0)
-        d_orb += tiers_from_level(orb.level) * prof.orb_level_weights.get(orb.type, 0.0)
+        return d_set
 
-        return d_set, d_orb
+    def _set_term(self, prof: ProfileConfig, set_name: str, count: int) -> float:
+        """One set's contribution to `set_score` at `count` pieces: w * tiers_met^power."""
+        th = DEFAULT_SET_COUNTS.get(set_name)
+        if not th:
+            return 0.0
+        tiers_met = sum(1 for t in th if count >= t)
+        if tiers_met <= 0:
+            return 0.0
+        return prof.set_priority.get(set_name, 0.0) * float(tiers_met ** prof.power)
 
     # ---------------- Scoring ----------------
     def _score_one(self, prof: ProfileConfig, loadout: Dict[str, List[Orb]]) -> Tuple[float, float]:
         """Compute (set_score, orb_score) for a single profile, matching beam's scoring."""
-        chosen = [o for group in loadout.values() for o in group]
-
-        # Set score: w * tiers_met^power
-        counts = Counter(o.set_name for o in chosen)
-        set_score = 0.0
-        for s, c in counts.items():
-            th = DEFAULT_SET_COUNTS.get(s)
-            if not th:
-                continue
-            tiers_met = sum(1 for t in th if c >= t)
-            if tiers_met <= 0:
-                continue
-            w = prof.set_priority.get(s, 0.0)
-            set_score += w * (tiers_met ** prof.power)
-
-        # Orb score: percentile + level tiers with weights
+        # One pass over the chosen orbs: piece count per set id + orb score
+        # (precomputed per-orb contribution for this profile)
+        contrib = self._orb_contrib[prof.name]
+        orb_set_id = self._orb_set_id
+        counts = [0] * self._num_sets
+        seen: List[int] = []  # set ids in first-seen order, so sums add up as before
         orb_score = 0.0
-        for o in chosen:
-            try:
-                raw = float(o.value)
-            except Exception:
-                raw = 0.0
-            base = percentile_within_type(self._type_values, o.type, raw)
-            orb_score += base * prof.orb_type_weights.get(o.type, 1.0)
-            orb_score += tiers_from_level(o.level) * prof.orb_level_weights.get(o.type, 0.0)
+        for o in chain.from_iterable(loadout.values()):
+            k = orb_key(o)
+            sid = orb_set_id[k]
+            if not counts[sid]:
+                seen.append(sid)
+            counts[sid] += 1
+            orb_score += contrib[k]
+
+        # Set score: w * tiers_met^power (tabulated per set id and piece count)
+        terms_by_set = self._set_terms[prof.name]
+        set_score = 0.0
+        for sid in seen:
+            terms = terms_by_set[sid]
+            set_score += terms[min(counts[sid], len(terms) - 1)]
 
         return set_score, orb_score
 
@@ -13,7 +13,7 @@ from typing import Any, TYPE_CHECKING
 from .models import ProfileConfig
 
 if TYPE_CHECKING:
-    from .data_loader import DataLoader
+    from .data_loader import DataLoader, WeightKind
 
 # === Rarity mappings ===
 RARITY_SCORE: dict[str, int] = {
@@ -96,6 +96,15 @@ def parse_value(value: Any) -> float:
             return 0.0
     return 0.0
 
+
+# (weights kind, profiles.json key, ProfileConfig field)
+_PROFILE_WEIGHT_SOURCES: tuple[tuple["WeightKind", str, str], ...] = (
+    ("set_priority", "set_priority", "set_priority"),
+    ("orb_type", "orb_weights", "orb_type_weights"),
+    ("orb_level", "orb_level_weights", "orb_level_weights"),
+)
+
+
 def build_profiles_from_json(loader: "DataLoader", path: str) -> tuple[list[ProfileConfig], list[str]]:
     """Read profiles.json and convert to ProfileConfig list."""
     cfg = loader.load_json(path)
@@ -109,15 +118,14 @@ def build_profiles_from_json(loader: "DataLoader", path: str) -> tuple[list[Prof
     out: list[ProfileConfig] = []
     for pj in profiles_json:
         name = pj["name"]
-        set_prio = loader.load_set_priority_or_default(pj.get("set_priority"))
-        type_w = loader.load_orb_type_weights_or_default(pj.get("orb_weights"))
-        lvl_w = loader.load_orb_level_weights_or_default(pj.get("orb_level_weights"))
+        weights = {
+            field: loader.load_weights(kind, pj.get(key))
+            for kind, key, field in _PROFILE_WEIGHT_SOURCES
+        }
         out.append(
             ProfileConfig(
                 name=name,
-                set_priority=set_prio,
-                orb_type_weights=type_w,
-                orb_level_weights=lvl_w,
+                **weights,
                 power=float(pj.get("power", 2.0)),
                 epsilon=float(pj.get("epsilon", 0.02)),  # keep aligned with CLI default
                 objective=pj.get("objective", "sets-first"),
@@ -138,14 +146,11 @@ def build_default_profile(
     power: float,
     epsilon: float,
 ) -> ProfileConfig:
-    set_prio = loader.load_set_priority_or_default(set_priority_path)
-    type_w = loader.load_orb_type_weights_or_default(orb_weights_path)
-    lvl_w = loader.load_orb_level_weights_or_default(orb_level_weights_path)
     return ProfileConfig(
         name="DEFAULT",
-        set_priority=set_prio,
-        orb_type_weights=type_w,
-        orb_level_weights=lvl_w,
+        set_priority=loader.load_weights("set_priority", set_priority_path),
+        orb_type_weights=loader.load_weights("orb_type", orb_weights_path),
+        orb_level_weights=loader.load_weights("orb_level", orb_level_weights_path),
         power=power,
         epsilon=epsilon,
         objective=objective,
@@ -0,0 +1,209 @@
+"""Tests for the beam solver (UnifiedOptimizer)."""
+
+import logging
+import random
+
+import pytest
+
+from orb_optimizer.defaults import (
+    DEFAULT_ORB_LEVEL_WEIGHTS,
+    DEFAULT_ORB_TYPE_WEIGHTS,
+    DEFAULT_SET_PRIORITY_WEIGHTS,
+)
+from orb_optimizer.models import Category, Inputs, Orb, ProfileConfig
+from orb_optimizer.solvers.beam import BeamNode, UnifiedOptimizer
+from orb_optimizer.solvers.greedy import GreedyOptimizer
+
+LOGGER = logging.getLogger("orb_optimizer.tests")
+
+
+def _profile(name: str = "Main", **overrides) -> ProfileConfig:
+    return ProfileConfig(
+        name=name,
+        set_priority=DEFAULT_SET_PRIORITY_WEIGHTS,
+        orb_type_weights=DEFAULT_ORB_TYPE_WEIGHTS,
+        orb_level_weights=DEFAULT_ORB_LEVEL_WEIGHTS,
+        **overrides,
+    )
+
+
+def _optimizer(orbs, slots, shareable=(), profiles=None) -> UnifiedOptimizer:
+    inputs = Inputs(
+        orbs=orbs,
+        categories=[Category(name=n, slots=s) for n, s in slots.items()],
+        profiles=profiles or [_profile()],
+        shareable_categories=list(shareable),
+    )
+    return UnifiedOptimizer(logger=LOGGER, inputs=inputs)
+
+
+def _root(uopt: UnifiedOptimizer) -> BeamNode:
+    """Empty beam state, as `_beam_search` starts from."""
+    n_sets = len(uopt._set_thresholds)
+    scores = {p.name: ([0] * n_sets, 0.0, 0.0) for p in uopt.P.profiles}
+    return BeamNode(None, "", (), 0, scores, (0.0, 0.0))
+
+
+# Two orbs that differ only in rarity: the Magic one is listed first, so Ego
+# reserves it and the Legendary one stays free
+MAGIC = Orb(type="Water", set_name="Leviathan", rarity="Magic", value=300.0, level=3)
+LEGENDARY = Orb(type="Water", set_name="Leviathan", rarity="Legendary", value=300.0, level=3)
+RARITY_TWIN_ORBS = [
+    MAGIC,
+    LEGENDARY,
+    Orb(type="Water", set_name="Mammon", rarity="Rare", value=120.0, level=0),
+    Orb(type="Flame", set_name="Satan", rarity="Heroic", value=250.0, level=6),
+    Orb(type="Flame", set_name="Leviathan", rarity="Rare", value=90.0, level=0),
+    Orb(type="Steel", set_name="Mammon", rarity="Rare", value=150.0, level=3),
+]
+RARITY_TWIN_SLOTS = {"Ego": 1, "Soul": 1, "Wagon": 1}
+
+
+def test_eligibility_tells_rarity_twins_apart():
+    uopt = _optimizer(RARITY_TWIN_ORBS, RARITY_TWIN_SLOTS, shareable=["Wagon"])
+    assert MAGIC in uopt.reserved_orbs["Ego"]["Water"]
+    assert LEGENDARY not in uopt.reserved_orbs["Ego"]["Water"]
+
+    for cat in uopt.P.categories:
+        kept = uopt._expand_with_lists([_root(uopt)], [[(o,) for o in RARITY_TWIN_ORBS]], cat, beam_width=100)[0]
+        placed = {node.choices[0][0] for node in kept}
+        assert placed == {o for o in RARITY_TWIN_ORBS if uopt._can_use_orb(o, cat)}, cat.name
+
+
+
+# Single profile, two shareable categories: expansion offers each shared combo
+# from the shared pass and again from the product walk, and equal-scoring states
+# are kept in generation order. Pins the winner that order produces.
+TIE_ORBS = [
+    Orb(type="Water", set_name="Mammon", rarity="Rare", value=300.0, level=3),
+    Orb(type="Water", set_name="Satan", rarity="Rare", value=200.0, level=3),
+    Orb(type="Flame", set_name="Leviathan", rarity="Rare", value=100.0, level=0),
+    Orb(type="Flame", set_name="Satan", rarity="Rare", value=100.0, level=3),
+    Orb(type="Water", set_name="Mammon", rarity="Rare", value=200.0, level=3),
+    Orb(type="Steel", set_name="Leviathan", rarity="Rare", value=200.0, level=0),
+    Orb(type="Water", set_name="Mammon", rarity="Rare", value=200.0, level=0),
+    Orb(type="Steel", set_name="Satan", rarity="Rare", value=200.0, level=3),
+    Orb(type="Flame", set_name="Satan", rarity="Rare", value=100.0, level=3),
+]
+
+
+def test_single_profile_shareable_tie_break_is_deterministic():
+    uopt = _optimizer(TIE_ORBS, {"Wings": 1, "Wagon": 1, "Ego": 1}, shareable=["Wings", "Wagon"])
+    result = uopt.optimize(beam_width=2)
+
+    assert result["combined_score"] == pytest.approx(1.1)
+    assert result["assign"]["Main"] == {
+        "Wings": [TIE_ORBS[4]],
+        "Wagon": [TIE_ORBS[6]],
+        "Ego": [TIE_ORBS[7]],
+    }
+
+
+# Single profile, started from a weak but valid loadout (indices into REFINE_ORBS)
+REFINE_ORBS = [
+    Orb(type="Flame", set_name="Leviathan", rarity="Rare", value=190.0, level=6),
+    Orb(type="Wind", set_name="Leviathan", rarity="Rare", value=40.0, level=6),
+    Orb(type="Lightning", set_name="Satan", rarity="Rare", value=300.0, level=9),
+    Orb(type="Steel", set_name="Leviathan", rarity="Rare", value=230.0, level=0),
+    Orb(type="Flame", set_name="Satan", rarity="Rare", value=170.0, level=6),
+    Orb(type="Water", set_name="Mammon", rarity="Rare", value=220.0, level=3),
+    Orb(type="Water", set_name="Mammon", rarity="Rare", value=290.0, level=6),
+    Orb(type="Wind", set_name="Mammon", rarity="Rare", value=120.0, level=3),
+    Orb(type="Steel", set_name="Leviathan", rarity="Rare", value=130.0, level=0),
+    Orb(type="Lightning", set_name="Satan", rarity="Rare", value=40.0, level=0),
+]
+REFINE_START = {"Soul": [2, 0], "Wings": [6], "Ego": [1], "Wagon": [9]}
+
+
+def _refine_setup():
+    uopt = _optimizer(
+        REFINE_ORBS,
+        {name: len(ix) for name, ix in REFINE_START.items()},
+        shareable=["Wagon"],
+        profiles=[_profile(epsilon=0.02)],
+    )
+    start = {"Main": {name: [REFINE_ORBS[i] for i in ix] for name, ix in REFINE_START.items()}}
+    return uopt, start
+
+
+# Keys refine reaches by scanning replacements in inventory order, per pass count.
+# Scanning in descending-contribution order instead ends lower on this loadout.
+REFINE_KEYS = {1: (8.23, 11.5), 2: (8.25, 12.5), 3: (8.29, 14.5)}
+
+
+@pytest.mark.parametrize("passes", sorted(REFINE_KEYS))
+def test_refine_does_not_end_below_inventory_order_result(passes):
+    uopt, start = _refine_setup()
+    key = uopt._key(uopt.refine(start, max_passes=passes))
+    assert key >= tuple(k - 1e-9 for k in REFINE_KEYS[passes])
+
+
+def _two_profile_optimizer(seed: int, n_orbs: int = 40) -> UnifiedOptimizer:
+    """Seeded two-profile inventory with one non-shareable and two shareable categories."""
+    rng = random.Random(seed)
+    types = list(DEFAULT_ORB_TYPE_WEIGHTS)
+    sets = list(DEFAULT_SET_PRIORITY_WEIGHTS)
+    orbs = [
+        Orb(
+            type=rng.choice(types),
+            set_name=rng.choice(sets),
+            rarity="Rare",
+            value=float(rng.randrange(20, 400, 10)),
+            level=rng.choice([0, 3, 6, 9]),
+        )
+        for _ in range(n_orbs)
+    ]
+    profiles = [
+        _profile("PVP", objective="types-first", epsilon=0.02),
+        _profile("PVE", objective="sets-first", epsilon=0.01, power=2.5, weight=0.8),
+    ]
+    return _optimizer(orbs, {"Soul": 2, "Wagon": 1, "Wings": 1}, shareable=["Wagon", "Wings"], profiles=profiles)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_refine_running_key_matches_full_rescore(seed):
+    uopt = _two_profile_optimizer(seed)
+    start = GreedyOptimizer(logger=LOGGER, inputs=uopt.P).optimize()["assign"]
+
+    # Record the last (set_s, orb_s) each profile's objective saw. refine returns
+    # right after the swap that uses up its last pass, so for the profile that
+    # swapped, that is the running score it accepted.
+    last_scores = {}
+
+    def recording(name, fn):
+        def objective(set_s, orb_s):
+            last_scores[name] = (set_s, orb_s)
+            return fn(set_s, orb_s)
+        return objective
+
+    uopt._objective_fn = {name: recording(name, fn) for name, fn in uopt._objective_fn.items()}
+
+    # refine accepts at most one swap per pass, so `passes` passes from `start`
+    # stop right after the `passes`-th accepted swap
+    prev = start
+    for passes in range(1, 6):
+        cur = uopt.refine(start, max_passes=passes)
+        if cur == prev:
+            break
+        (swapped,) = [p for p in uopt.P.profiles if cur[p.name] != prev[p.name]]
+        assert last_scores[swapped.name] == pytest.approx(uopt._score_one(swapped, cur[swapped.name]))
+        assert uopt._key(cur) > uopt._key(prev)
+        prev = cur
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_expansion_floor_bound_keeps_the_unbounded_top(seed):
+    uopt = _two_profile_optimizer(seed)
+    soul, wagon, wings = uopt.P.categories
+    full = [uopt._valid_combos_by_cat[soul.name]] * 2
+    partials, _ = uopt._expand_with_lists([_root(uopt)], full, soul, beam_width=8)
+
+    # A beam that never fills never applies the floor bound; the bounded run must
+    # keep exactly its best `width` states, in the same order
+    for cat in (wagon, wings):
+        lists = [uopt._valid_combos_by_cat[cat.name]] * 2
+        unbounded, _ = uopt._expand_with_lists(partials, lists, cat, beam_width=10**9)
+        for width in (1, 3, 8):
+            bounded, _ = uopt._expand_with_lists(partials, lists, cat, beam_width=width)
+            assert [(n.key, n.choices) for n in bounded] == [(n.key, n.choices) for n in unbounded[:width]]
+        partials = unbounded[:8]